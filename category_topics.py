@@ -0,0 +1,81 @@
+import json
+import os
+import re
+
+os.makedirs("data", exist_ok=True)
+
+CATEGORY_TOPICS_PATH = "data/category_topics.json"
+
+_TAG_SEPARATORS = re.compile(r"[\s_\-]+")
+
+
+def normalize_tag(tag):
+    """
+    Normalizes a tag so that typographic variants compare equal
+    (e.g. "Machine Learning", "machine-learning" and "MachineLearning",
+    or "LLM" and "LLMs").
+
+    Args:
+        tag (str): The tag to normalize.
+
+    Returns:
+        str: The tag with whitespace, underscores and hyphens removed, case-folded,
+             and a trailing plural "s" dropped.
+    """
+    key = _TAG_SEPARATORS.sub("", tag).casefold()
+    if len(key) > 3 and key.endswith("s") and not key.endswith("ss"):
+        key = key[:-1]
+    return key
+
+
+def load_category_topics(file_path=CATEGORY_TOPICS_PATH):
+    """
+    Loads the mapping of primary categories to their associated topic tags.
+    The file stores one canonical form per topic; variants are matched with normalize_tag.
+
+    Args:
+        file_path (str): Path to the category topics JSON file.
+
+    Returns:
+        dict: A dictionary mapping each category to a sorted tuple of topics,
+              one per normalized tag.
+              Returns an empty dict if the file is missing or invalid.
+    """
+    try:
+        with open(file_path, encoding="utf-8") as f:
+            mapping = json.load(f)
+    except FileNotFoundError:
+        print(f"Warning: Category topics file not found at {file_path}. No categories will be available.")
+        return {}
+    except json.JSONDecodeError:
+        print(f"Error: Could not decode JSON from {file_path}")
+        return {}
+
+    category_topics = {}
+    for category, topics in mapping.items():
+        # Keep the first display form of each topic; later variants normalize to the same key
+        unique_topics = {}
+        for topic in topics:
+            unique_topics.setdefault(normalize_tag(topic), topic)
+        category_topics[category] = tuple(sorted(unique_topics.values()))
+    return category_topics
+
+
+def build_tag_to_category(category_topics):
+    """
+    Builds an inverse index from normalized topic tags to their category.
+
+    Args:
+        category_topics (dict): A mapping of category to topic tags, as returned
+                                by load_category_topics.
+
+    Returns:
+        dict: A dictionary mapping each normalized tag to its category.
+    """
+    return {normalize_tag(topic): category for category, topics in category_topics.items() for topic in topics}
+
+
+if __name__ == "__main__":
+    category_topics = load_category_topics()
+    for category, topics in category_topics.items():
+        print(f"{category}: {len(topics)} topics")
@@ -1,15 +1,50 @@
+from contextlib import asynccontextmanager
 from langchain_groq import ChatGroq
+import httpx
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
-llm = ChatGroq(groq_api_key=os.getenv("GROQ_API_KEY"), model_name="llama-3.3-70b-versatile")
 
+# Large model for user-facing post generation
+BIG_MODEL = "llama-3.3-70b-versatile"
+# Small, fast model for low-complexity preprocessing (tag and category extraction)
+SMALL_MODEL = "llama-3.1-8b-instant"
+
+# Shared keep-alive connection pool so sync Groq requests reuse TCP/TLS connections.
+# Async clients are not shared: their connections belong to the event loop that opened them.
+_http_limits = httpx.Limits(max_keepalive_connections=20, max_connections=40)
+_http_client = httpx.Client(limits=_http_limits)
+
+
+def _chat_groq(model_name, http_async_client=None):
+    """Builds a ChatGroq client for model_name on the shared sync connection pool."""
+    return ChatGroq(
+        groq_api_key=os.getenv("GROQ_API_KEY"),
+        model_name=model_name,
+        http_client=_http_client,
+        http_async_client=http_async_client,
+    )
 
-if __name__ == "__main__":
-    response = llm.invoke("Two things a Data Scientist should never let go")
-    print(response.content)
 
+llm_big = _chat_groq(BIG_MODEL)
+llm_small = _chat_groq(SMALL_MODEL)
 
 
+@asynccontextmanager
+async def async_llm(model_name):
+    """
+    Yields a ChatGroq client whose async connection pool lives only as long as the
+    enclosing block, so it is never reused from another (possibly closed) event loop.
+    Use once per event loop, e.g. inside the coroutine passed to asyncio.run.
 
+    Args:
+        model_name (str): The Groq model to use (e.g. SMALL_MODEL).
+    """
+    async with httpx.AsyncClient(limits=_http_limits) as http_async_client:
+        yield _chat_groq(model_name, http_async_client=http_async_client)
+
+
+if __name__ == "__main__":
+    response = llm_big.invoke("Two things a Data Scientist should never let go")
+    print(response.content)
@@ -1,86 +1,44 @@
 import streamlit as st
 from output_generator import generate_post
 from reference_posts import ReferencePosts
-from llm_helper import llm
+from category_topics import load_category_topics
 
-# Initializing ReferencePosts
-few_shot_provider = ReferencePosts(file_path="data/pro_posts.json")
-unique_tags = few_shot_provider.get_tags()
+@st.cache_resource
+def get_provider():
+    """Initializes ReferencePosts once per process instead of on every rerun."""
+    return ReferencePosts(file_path="data/pro_posts.json")
+
+
+def get_unique_tags():
+    """
+    Returns the unique tags of the cached ReferencePosts provider. Not cached itself: the
+    provider already holds the tags, and a failed load must not pin an empty list.
+    """
+    return get_provider().get_tags()
+
+
+@st.cache_data
+def get_category_topic_mapping():
+    """Loads the primary categories and their sorted, de-duplicated topics once per process."""
+    return load_category_topics()
+
+
+few_shot_provider = get_provider() # Construction is cheap; posts load on first query
 
 st.title("LinkedIn Post Generator")
 
-# --- Defining Primary Categories and their Associated Tags ---
-category_topic_mapping = {
-    "Artificial Intelligence (AI) & Machine Learning (ML)": [
-        'AI', 'Artificial Intelligence', 'ArtificialIntelligence', 'ai',
-        'ML', 'Machine Learning', 'MachineLearning', 'machine learning', 'machine-learning', 'machine_learning', 'machinelearning',
-        'Deep Learning', 'DeepLearning', 'deep learning', 'deep-learning', 'deep_learning', 'deeplearning',
-        'NLP', 'Natural Language Processing', 'nlp',
-        'Computer Vision', 'ComputerVision', 'computer vision', 'computer-vision', 'computervision', '3Dvision',
-        'GenAI', 'AutonomousAgents', 'MultiAgentSystems', 'Multimodal', 'MultimodalLearning',
-        'Recommendation System', 'recommendation system', 'ReinforcementLearning', 'TinyML',
-        'Transformer', 'transformers', 'Vision Transformers', 'GANs', 'LLM', 'LLMs', 'BERT', 'LSTMs/GRUs',
-        'Self-Attention', 'self-attention', 'Positional-encoding', 'RAG'
-    ],
-    "AI/ML Concepts & Techniques": [
-        'Algorithms', 'ActivationFunctions', 'activationfunction', 'Embeddings',
-        'Gradient Descent', 'GradientDescent', 'Hyperparameter tuning',
-        'Neural Networks', 'NeuralNetworks', 'neuralnetworks', 'Optimization',
-        'Overfitting', 'TransferLearning', 'XGBoost', 'YOLO', 'Clustering',
-        'Dimensionality_reduction', 'Sequence', 'Stochasticity', 'Unsupervised_learning'
-    ],
-    "Data Science & Analytics": [
-        'Data Science', 'DataScience', 'data science', 'data-science', 'datascience',
-        'Data Analysis', 'Data Analytics', 'DataAnalysis', 'data science',
-        'Data Visualization', 'Dashboards', 'Business Intelligence', 'SQL',
-        'Statistics', 'Data Imputation', 'Data Quality', 'DataQuality',
-        'Data Augmentation', 'DataAugmentation', 'data_augmentation',
-        'Data Cleaning', 'DataPreprocessing', 'Data Transformation',
-        'Feature Engineering', 'FeatureEngineering', 'featureengineering', 'Metrics', 'Observability'
-    ],
-    "Development & Deployment": [
-        'Coding', 'coding', 'Programming Languages', 'ProgrammingLanguages', 'programming',
-        'Software Development', 'software development', 'Full Stack Development', 'CI/CD',
-        'Deployment', 'deploymentsuccess', 'DevOps', 'Docker', 'Edge AI',
-        'Infrastructure as Code', 'Model Serving', 'Model Training', 'ModelTraining', 'Model_Training',
-        'FastAPI', 'Open-source', 'PyTorch', 'Sklearn', 'Debugging', 'debugging', 'EnvironmentSeparation'
-    ],
-    "Career & Professional Growth": [
-        'Career', 'career', 'CareerAdvice', 'career advice', 'career-advice', 'career_advice', 'careeradvice',
-        'Career Development', 'career development', 'career_development', 'Job Search Tips', 'job_search',
-        'Hiring', 'Internship', 'Leadership', 'leadership', 'Learning', 'learning', 'LearningStrategy',
-        'Personal Development', 'Personal Growth', 'PersonalBranding', 'PersonalDevelopment', 'PersonalGrowth', 'personal_branding', 'personal_development',
-        'Productivity', 'productivity', 'Self Improvement', 'Self-Improvement', 'self-improvement', 'self_improvement',
-        'SoftSkills', 'Teamwork', 'teamwork', 'teammanagement', 'Time Management', 'TimeManagement', 'time management', 'time_management',
-        'Coaching', 'Entrepreneurship', 'Freelancing', 'Interview', 'interview-prep', 'interviews',
-        'Networking', 'ResumeBuilding', 'resume_building'
-    ],
-    "Ethics & Governance": [
-        'AI governance', 'AI_trust', 'Ethics', 'EthicsInTech', 'RegulatoryCompliance',
-        'ResponsibleAI', 'ModelExplainability', 'Model_Explainability', 'model_explainability', 'Explainability'
-    ],
-    "Personal Well-being & Mindset": [
-        'Confidence', 'DigitalDetox', 'Focus', 'Inspiration', 'inspiration',
-        'Meditation', 'MentalHealth', 'mindfulness', 'mindset', 'health', 'health',
-        'Motivation', 'motivation', 'Simplicity', 'Simplification', 'Wellness'
-    ],
-    "Applications & Domains": [
-        'Agriculture', 'Airbnb', 'airbnb', 'Finance', 'Fraud Detection', 'Gaming',
-        'Healthcare', 'healthcare', 'Neuroscience', 'ProductManagement', 'productmanagement',
-        'Startup', 'UXDesign'
-    ],
-    "Humor & Miscellaneous": [
-        'Humor', 'humor', 'Programmer humor', 'Storytelling', 'storytelling',
-        'Academia', 'Simulation'
-    ]
-}
+# --- Loading Primary Categories and their Associated Tags ---
+category_topic_mapping = get_category_topic_mapping()
 
 # --- Primary Category Selection ---
 primary_categories = list(category_topic_mapping.keys())
 selected_category = st.selectbox("Select a Broad Category:", primary_categories)
 
 # --- Secondary Topic Selection (Dynamic based on Primary Category) ---
-available_topics = sorted(list(set(category_topic_mapping.get(selected_category, unique_tags))))
+available_topics = category_topic_mapping.get(selected_category)
+if available_topics is None:
+    # Only categories missing from the mapping need the loaded posts' tags
+    available_topics = get_unique_tags()
 
 if available_topics:
     topic = st.selectbox(f"Select a Specific Topic within '{selected_category}':", available_topics)
@@ -99,7 +57,7 @@ if st.button("Generate Post"):
             examples = few_shot_provider.get_top_engaging_posts(length, topic, n=num_examples)
             generated_post = generate_post(length, topic, formatting_style=style, reference_post_examples=examples)
             st.subheader("Generated Post:")
-            st.write(generated_post)
+            st.write_stream(generated_post)
         else:
             st.warning("Reference-post examples are not available.")
     else:
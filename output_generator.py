@@ -1,17 +1,33 @@
-from llm_helper import llm
+from llm_helper import llm_big
 from reference_posts import ReferencePosts  # Importing the class from the other file
 import random
 import os
 
 os.makedirs("data", exist_ok=True)
 
-# This instance will hold the processed posts for few-shot examples
-print("Initializing ReferencePosts for post generation...")
-try:
-    reference_post_provider = ReferencePosts(file_path="data/pro_posts.json")
-except Exception as e:
-    print(f"Error initializing ReferencePosts: {e}. Few-shot examples might be unavailable.")
-    reference_post_provider = None  # Set to None to handle gracefully later
+# Static instructions for post generation; only the topic and length are interpolated per call
+_POST_PROMPT_TEMPLATE = '''
+Write a LinkedIn post. Output only the post content, no preamble or explanation.
+Rules:
+- Structure: hook (question, statistic, bold claim or relatable observation) -> core insight -> optional brief example -> takeaway or question inviting comments.
+- Tone: professional, insightful, engaging; practical value or a fresh perspective.
+- Clear, concise language; explain any jargon.
+- No generic or promotional content.
+
+1) Topic: {tag}
+2) Length: {length_str}
+3) Language: English'''
+
+# Formatting instructions the "Auto" style picks from at random
+_AUTO_STYLES = (
+    "\n4) Formatting: Write in plain paragraphs. You may use emojis sparingly if appropriate.",
+    "\n4) Formatting: Incorporate relevant emojis naturally where they add value.",
+    "\n4) Formatting: Use bullet points (using '-' or '*') for key points or lists if it improves clarity.",
+    "\n4) Formatting: Feel free to use both emojis and bullet points where appropriate to enhance readability and engagement.",
+    "\n4) Formatting: Write primarily in paragraphs, but you can use bullet points for lists if needed. Emojis are optional.",
+)
+_rng = random.Random()
+
 
 def get_length_str(length):
     """Converts length category to a string description for the prompt."""
@@ -39,26 +55,7 @@ def get_prompt(length, tag, formatting_style="Auto", reference_post_examples=Non
     Returns:
         str: The fully constructed prompt for the LLM.
     """
-    length_str = get_length_str(length)
-    language = "English"
-
-    prompt = f'''
-Generate a LinkedIn post using the below information. Write only the post content, no preamble or explanation before it.
-
-1) Topic: {tag}
-2) Length: {length_str}
-3) Language: {language}
-
-Instructions: Write a compelling LinkedIn post in {language} about "{tag}". Aim for a **professional, insightful, and engaging tone** that encourages interaction. The post should provide **practical value or a fresh perspective** for the reader. Use clear and concise language, avoiding overly technical jargon unless the topic specifically requires it and is clearly explained.
-
-Structure of the Post:
-(a) Hook: Start with a **strong opening that grabs attention immediately**. This could be a thought-provoking question, a surprising statistic, a bold statement related to '{tag}', or a relatable observation about the professional world concerning '{tag}'.
-(b) Main Idea: Clearly and concisely explain the core concept, trend, or insight related to '{tag}'. Break down complex ideas into digestible points if necessary.
-(c) Examples/Analogies (Optional): If helpful for understanding '{tag}', briefly include a real-world example or an analogy. Keep it concise and directly relevant.
-(d) Actionable Takeaway/Conclusion: End with a **clear takeaway, practical tip, or a thought-provoking question** that encourages readers to share their own experiences or opinions on '{tag}' in the comments.
-
-**Focus on providing value to the reader and sparking conversation.** Avoid generic statements or overly promotional content.
-'''
+    prompt = _POST_PROMPT_TEMPLATE.format(tag=tag, length_str=get_length_str(length))
 
     if formatting_style == "Use Emojis":
         prompt += "\n4) Formatting: Incorporate relevant emojis naturally within the text to enhance readability and tone. Do not use bullet points."
@@ -66,14 +63,7 @@ Structure of the Post:
         prompt += "\n4) Formatting: Do not use any emojis or bullet points. Write in plain paragraphs only."
     elif formatting_style == "Auto":
         # Randomly choose a style for Auto
-        style_instruction = random.choice([
-            "\n4) Formatting: Write in plain paragraphs. You may use emojis sparingly if appropriate.",
-            "\n4) Formatting: Incorporate relevant emojis naturally where they add value.",
-            "\n4) Formatting: Use bullet points (using '-' or '*') for key points or lists if it improves clarity.",
-            "\n4) Formatting: Feel free to use both emojis and bullet points where appropriate to enhance readability and engagement.",
-            "\n4) Formatting: Write primarily in paragraphs, but you can use bullet points for lists if needed. Emojis are optional."
-        ])
-        prompt += style_instruction
+        prompt += _AUTO_STYLES[_rng.randrange(len(_AUTO_STYLES))]
     else:  # Default to plain text if style is unrecognized
         prompt += "\n4) Formatting: Write in plain paragraphs only."
 
@@ -91,8 +81,8 @@ Structure of the Post:
 
 def generate_post(length, tag, formatting_style="Auto", reference_post_examples=None):
     """
-    Generates an English LinkedIn post using the LLM based on specified parameters
-    and optional few-shot examples.
+    Streams an English LinkedIn post from the LLM based on specified parameters
+    and optional few-shot examples, yielding content as it is generated.
 
     Args:
         length (str): Desired post length ("Short", "Medium", "Long").
@@ -101,25 +91,37 @@ def generate_post(length, tag, formatting_style="Auto", reference_post_examples=
                                         "Use Bullet Points", "Plain Text").
         reference_post_examples (list, optional): A list of example posts to guide generation.
 
-    Returns:
-        str: The generated post content, or an error message.
+    Yields:
+        str: Chunks of the generated post content, or an error message.
     """
     print(f"\nGenerating post for Tag='{tag}', Length='{length}', Style='{formatting_style}'...")
 
     try:
         prompt = get_prompt(length, tag, formatting_style, reference_post_examples)
-        response = llm.invoke(prompt)
-        generated_content = response.content
-        print("  -> LLM invocation successful.")
-        return generated_content.strip()  # Remove leading/trailing whitespace
+        started = False
+        for chunk in llm_big.stream(prompt):
+            content = chunk.content
+            if not started:
+                content = content.lstrip()  # Remove leading whitespace
+                started = bool(content)
+            if content:
+                yield content
+        print("  -> LLM streaming successful.")
     except Exception as e:
         print(f"Error generating post: {e}")
-        return f"Error: Could not generate post content. Details: {e}"
+        yield f"Error: Could not generate post content. Details: {e}"
 
 
 if __name__ == "__main__":
     print("\nRunning post generator script...")
 
+    # Callers (e.g. main.py) own the ReferencePosts instance; the script builds its own
+    try:
+        reference_post_provider = ReferencePosts(file_path="data/pro_posts.json")
+    except Exception as e:
+        print(f"Error initializing ReferencePosts: {e}. Few-shot examples might be unavailable.")
+        reference_post_provider = None  # Set to None to handle gracefully later
+
     chosen_tag = "AI"  # Default example tag (can be any tag now)
     available_tags = []
     if reference_post_provider:
@@ -138,7 +140,7 @@ if __name__ == "__main__":
     example_posts_for_test = [{"text": "Test example post 1."}, {"text": "Test example post 2."}]
 
     # Generate the post WITH few-shot examples for testing
-    generated_post_content = generate_post(post_length, chosen_tag, formatting_style=post_style, reference_post_examples=example_posts_for_test)
+    generated_post_content = "".join(generate_post(post_length, chosen_tag, formatting_style=post_style, reference_post_examples=example_posts_for_test))
 
     # Print the result
     print("\n--- Generated LinkedIn Post ---")
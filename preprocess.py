@@ -1,6 +1,9 @@
-import json
+import asyncio
+import hashlib
 import os
-from llm_helper import llm 
+import orjson
+from llm_helper import SMALL_MODEL, async_llm, llm_small
+from category_topics import build_tag_to_category, load_category_topics, normalize_tag
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.exceptions import OutputParserException
@@ -8,9 +11,67 @@ from langchain_core.exceptions import OutputParserException
 
 os.makedirs("data", exist_ok=True)
 
+# Upper bound on in-flight Groq requests during metadata extraction
+MAX_CONCURRENT_REQUESTS = 20
+# Number of posts packed into a single metadata extraction prompt
+BATCH_SIZE = 16
+# Extracted metadata keyed by the SHA-256 of the post text, reused across runs.
+# The file stores {"version": ..., "entries": {...}}; see _METADATA_CACHE_VERSION.
+METADATA_CACHE_PATH = "data/metadata_cache.json"
+
+_EXTRACT_TEMPLATE = '''
+You are given the text content of a single LinkedIn post. Your task is to extract specific metadata.
+Follow these instructions precisely:
+1. Analyze the post text provided below the triple backticks.
+2. Classify the post into exactly ONE of these categories, copying its name exactly:
+{categories}
+3. **Identify the ONE or TWO MOST relevant tags that best describe the post's content.**
+4. Format your entire response as a single, valid JSON object. Do NOT include any text before or after the JSON object (no preamble, no explanations, no markdown formatting like ```json).
+5. The JSON object must contain exactly these two keys: "category" (string) and "tags" (JSON array of strings, max 2 elements).
+
+Post Text:
+```{post}```
+'''
+
+_EXTRACT_BATCH_TEMPLATE = '''
+You are given the text content of {count} LinkedIn posts. Each post is wrapped between "### POST i ###" and "### END i ###" markers.
+Follow these instructions precisely:
+1. Classify each post into exactly ONE of these categories, copying its name exactly:
+{categories}
+2. For each post, **identify the ONE or TWO MOST relevant tags that best describe the post's content.**
+3. Respond with a single JSON object with exactly one key, "posts": a JSON array of exactly {count} objects in order, one per post.
+4. Each object in "posts" must contain exactly these two keys: "category" (string) and "tags" (JSON array of strings, max 2 elements).
+
+Posts:
+{posts}
+'''
+
+# Each post is classified into one of the app's primary categories
+_CATEGORY_TOPICS = load_category_topics()
+ALLOWED_CATEGORIES = tuple(_CATEGORY_TOPICS)
+_CATEGORY_LIST = "\n".join(f"   - {category}" for category in ALLOWED_CATEGORIES)
+# Fallback when the LLM returns an unknown category: classify the post's tags locally
+_TAG_TO_CATEGORY = build_tag_to_category(_CATEGORY_TOPICS)
+
+# Identifies the model, prompts and category list that produced cached metadata; changing any
+# of them (and so the output schema) invalidates the whole metadata cache
+_METADATA_CACHE_VERSION = hashlib.sha256(
+    "\0".join((SMALL_MODEL, _EXTRACT_TEMPLATE, _EXTRACT_BATCH_TEMPLATE, _CATEGORY_LIST)).encode('utf-8')
+).hexdigest()
+
+# Groq JSON mode constrains the model to emit a single valid JSON object
+_JSON_MODE = {"type": "json_object"}
+# Default model for the async extraction functions when awaited from the caller's own loop;
+# the sync entry points open a fresh client per asyncio.run instead (see llm_helper.async_llm)
+_json_llm = llm_small.bind(response_format=_JSON_MODE)
+
+# Prompt templates are built once at import rather than on every call
+_EXTRACT_PROMPT = PromptTemplate.from_template(_EXTRACT_TEMPLATE).partial(categories=_CATEGORY_LIST)
+_EXTRACT_BATCH_PROMPT = PromptTemplate.from_template(_EXTRACT_BATCH_TEMPLATE).partial(categories=_CATEGORY_LIST)
+
 def process_posts(raw_file_path, processed_file_path):
     """
-    Reads raw posts, extracts metadata, unifies tags using an LLM,
+    Reads raw posts, extracts metadata (line count, tags and category) using an LLM,
     and saves the enriched posts.
 
     Args:
@@ -18,211 +79,292 @@ def process_posts(raw_file_path, processed_file_path):
         processed_file_path (str): Path where the processed JSON file will be saved.
     """
     try:
-        with open(raw_file_path, encoding='utf-8') as file:
-            posts = json.load(file)
+        with open(raw_file_path, mode="rb") as file:
+            posts = orjson.loads(file.read())
     except FileNotFoundError:
         print(f"Error: Raw posts file not found at {raw_file_path}")
         return
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         print(f"Error: Could not decode JSON from {raw_file_path}")
         return
 
-    enriched_posts = []
-    print(f"Starting metadata extraction for {len(posts)} posts...")
+    indexed_posts = []
     for i, post in enumerate(posts):
         if 'text' not in post:
             print(f"Warning: Post {i} missing 'text' key. Skipping.")
             continue
-        try:
-            print(f"Processing post {i+1}/{len(posts)}...")
-            metadata = extract_metadata(post['text'])
+        indexed_posts.append((i, post))
+
+    metadata_cache = _load_metadata_cache()
+    post_hashes = [_post_hash(post['text']) for _, post in indexed_posts]
+    results = [metadata_cache.get(post_hash) for post_hash in post_hashes]
+    uncached = [j for j, metadata in enumerate(results) if metadata is None]
+    print(f"Reusing cached metadata for {len(indexed_posts) - len(uncached)} posts.")
+
+    if uncached:
+        print(f"Starting metadata extraction for {len(uncached)} posts "
+              f"(batches of {BATCH_SIZE}, up to {MAX_CONCURRENT_REQUESTS} concurrent requests)...")
+        extracted = extract_metadata_batch([indexed_posts[j][1]['text'] for j in uncached])
+        for j, metadata in zip(uncached, extracted):
+            results[j] = metadata
+            if not isinstance(metadata, Exception):
+                metadata_cache[post_hashes[j]] = metadata
+    # Only the current posts are kept, so entries for removed or edited posts don't accumulate
+    _save_json_cache(
+        {"version": _METADATA_CACHE_VERSION, "entries": {h: metadata_cache[h] for h in post_hashes if h in metadata_cache}},
+        METADATA_CACHE_PATH,
+    )
+
+    enriched_posts = []
+    for (i, post), metadata in zip(indexed_posts, results):
+        if isinstance(metadata, OutputParserException):
+            print(f"Error parsing LLM response for post {i}: {metadata}. Skipping post.")
+        elif isinstance(metadata, Exception):
+            print(f"An unexpected error occurred processing post {i}: {metadata}. Skipping post.")
+        else:
             # Merges post data with extracted metadata (Requires Python 3.9+)
             post_with_metadata = post | metadata
             enriched_posts.append(post_with_metadata)
-            print(f"  -> Extracted metadata: {metadata}")
-        except OutputParserException as e:
-            print(f"Error parsing LLM response for post {i}: {e}. Skipping post.")
-            
-        except Exception as e:
-            print(f"An unexpected error occurred processing post {i}: {e}. Skipping post.")
+            print(f"  -> Post {i+1}/{len(posts)} extracted metadata: {metadata}")
 
     if not enriched_posts:
         print("No posts were successfully enriched. Exiting.")
         return
 
-    print("Starting tag unification...")
     try:
-        unified_tags_map = get_unified_tags(enriched_posts)
-        print(f"  -> Generated unified tag map for {len(unified_tags_map)} original tags.")
-    except OutputParserException as e:
-        print(f"Error parsing LLM response for tag unification: {e}. Cannot unify tags.")
+        with open(processed_file_path, mode="wb") as outfile:
+            outfile.write(orjson.dumps(enriched_posts, option=orjson.OPT_INDENT_2))
+        print(f"Successfully processed and saved {len(enriched_posts)} posts to {processed_file_path}")
+    except IOError as e:
+        print(f"Error writing processed posts to {processed_file_path}: {e}")
+    except TypeError as e:
+         print(f"Error serializing final posts to JSON: {e}")
 
-        unified_tags_map = None
-    except Exception as e:
-        print(f"An unexpected error occurred during tag unification: {e}. Cannot unify tags.")
-        unified_tags_map = None
-
-
-    final_posts = []
-    if unified_tags_map:
-        print("Applying unified tags...")
-        for post in enriched_posts:
-            if 'tags' in post and isinstance(post['tags'], list):
-                current_tags = post['tags']
-                # Map tags safely, keeping original if not in map
-                new_tags = {unified_tags_map.get(tag, tag) for tag in current_tags}
-                post['tags'] = sorted(list(new_tags)) # Sort for consistency
-            final_posts.append(post)
-        print("  -> Unified tags applied.")
-    else:
-        print("Skipping tag unification step due to previous errors.")
-        final_posts = enriched_posts # Use posts with original extracted tags
+
+def _post_hash(post_text):
+    """Returns the cache key for a post's text."""
+    return hashlib.sha256(post_text.encode('utf-8')).hexdigest()
 
 
+def _load_json_cache(cache_path):
+    """
+    Loads a JSON object cache from disk.
+
+    Args:
+        cache_path (str): Path to the cache JSON file.
+
+    Returns:
+        dict: The cached dictionary. Empty if the cache does not exist or cannot be read.
+    """
     try:
-        with open(processed_file_path, encoding='utf-8', mode="w") as outfile:
-            json.dump(final_posts, outfile, indent=4, ensure_ascii=False)
-        print(f"Successfully processed and saved {len(final_posts)} posts to {processed_file_path}")
+        with open(cache_path, mode="rb") as file:
+            cache = orjson.loads(file.read())
+    except FileNotFoundError:
+        return {}
+    except orjson.JSONDecodeError:
+        print(f"Warning: Could not decode cache at {cache_path}. Starting with an empty cache.")
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_json_cache(cache, cache_path):
+    """Writes a cache dictionary to disk, reporting (but not raising) write errors."""
+    try:
+        with open(cache_path, mode="wb") as outfile:
+            outfile.write(orjson.dumps(cache))
     except IOError as e:
-        print(f"Error writing processed posts to {processed_file_path}: {e}")
+        print(f"Error writing cache to {cache_path}: {e}")
     except TypeError as e:
-         print(f"Error serializing final posts to JSON: {e}")
+        print(f"Error serializing cache to JSON: {e}")
 
 
-def extract_metadata(post_text):
+def _load_metadata_cache():
     """
-    Uses an LLM to extract line count and up to two relevant tags from post text.
+    Loads the post-text hash -> extracted metadata cache. Returns an empty cache if the
+    file was written by another model, prompt or category list (or an older layout).
+    """
+    cache = _load_json_cache(METADATA_CACHE_PATH)
+    entries = cache.get("entries")
+    if cache.get("version") != _METADATA_CACHE_VERSION or not isinstance(entries, dict):
+        if cache:
+            print("Metadata cache was built with another extraction setup. Re-extracting all posts.")
+        return {}
+    return entries
+
+
+def count_lines(post_text):
+    """Counts the newline-separated lines in a post, treating empty lines as lines."""
+    return post_text.count("\n") + 1
+
+
+def extract_metadata_batch(post_texts, k=BATCH_SIZE):
+    """
+    Extracts metadata for many posts, packing k posts into each LLM prompt and
+    running the prompts concurrently (bounded by MAX_CONCURRENT_REQUESTS).
+    If a batch cannot be parsed, only that batch falls back to per-post extraction.
+    All requests run in a single event loop on an async client opened for this call.
 
     Args:
-        post_text (str): The text content of the LinkedIn post.
+        post_texts (list): The text content of each post.
+        k (int): The number of posts per prompt.
 
     Returns:
-        dict: A dictionary containing 'line_count' and 'tags'.
+        list: One entry per post text, in order. Each entry is either the
+              extracted metadata dict or the exception raised for that post.
+    """
+    return asyncio.run(_extract_metadata_concurrently(post_texts, k))
 
-    Raises:
-        OutputParserException: If the LLM response cannot be parsed as JSON.
+
+async def _extract_metadata_concurrently(post_texts, k):
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    async with async_llm(SMALL_MODEL) as llm:
+        json_llm = llm.bind(response_format=_JSON_MODE)
+
+        async def extract_single(post_text):
+            async with semaphore:
+                return await aextract_metadata(post_text, llm=json_llm)
+
+        async def extract_chunk(chunk):
+            async with semaphore:
+                try:
+                    return await aextract_metadata_batch(chunk, llm=json_llm)
+                except Exception as e:
+                    print(f"Warning: Batched extraction failed for {len(chunk)} posts: {e}. Falling back to per-post extraction.")
+            return await asyncio.gather(*(extract_single(post_text) for post_text in chunk), return_exceptions=True)
+
+        chunks = [post_texts[i:i + k] for i in range(0, len(post_texts), k)]
+        chunk_results = await asyncio.gather(*(extract_chunk(chunk) for chunk in chunks))
+    return [metadata for chunk_result in chunk_results for metadata in chunk_result]
+
+
+async def aextract_metadata_batch(post_texts, llm=_json_llm):
     """
-    template = '''
-You are given the text content of a single LinkedIn post. Your task is to extract specific metadata.
-Follow these instructions precisely:
-1. Analyze the post text provided below the triple backticks.
-2. Determine the number of lines in the post (count lines separated by newline characters '\\n'). Treat empty lines as lines.
-3. **Identify the ONE or TWO MOST relevant tags that best describe the post's content.**
-4. Format your entire response as a single, valid JSON object. Do NOT include any text before or after the JSON object (no preamble, no explanations, no markdown formatting like ```json).
-5. The JSON object must contain exactly these two keys: "line_count" (integer) and "tags" (JSON array of strings, max 2 elements).
+    Uses a single LLM call to classify each of several posts into one of
+    ALLOWED_CATEGORIES and extract up to two relevant tags for it.
+    Line counts are computed locally rather than by the LLM.
 
-Post Text:
-```{post}```
-'''
+    Args:
+        post_texts (list): The text content of each post in the batch.
+        llm (Runnable): The JSON-mode model to call. Defaults to the shared small model.
+
+    Returns:
+        list: A list of dictionaries containing 'line_count', 'tags' and 'category',
+              in input order.
 
-    pt = PromptTemplate.from_template(template)
-    chain = pt | llm
+    Raises:
+        OutputParserException: If the LLM response does not contain a "posts" array
+                               with one object per post.
+    """
+    posts_block = "\n\n".join(
+        f"### POST {i} ###\n{post_text}\n### END {i} ###" for i, post_text in enumerate(post_texts)
+    )
     try:
-        response = chain.invoke(input={"post": post_text})
-        content = response.content 
+        response = await (_EXTRACT_BATCH_PROMPT | llm).ainvoke(input={"count": len(post_texts), "posts": posts_block})
+        content = response.content
     except Exception as e:
         raise OutputParserException(f"LLM invocation failed: {e}")
 
     try:
         json_parser = JsonOutputParser()
         res = json_parser.parse(content)
-        # Basic validation
-        if not isinstance(res, dict) or "line_count" not in res or "tags" not in res:
-            raise OutputParserException("Parsed JSON missing required keys 'line_count' or 'tags'.")
-        # Validate line_count
-        if not isinstance(res["line_count"], int) or res["line_count"] < 0:
-            raise OutputParserException(f"Invalid 'line_count': {res['line_count']}. Must be a non-negative integer.")
-        # Validate tags
-        if isinstance(res["tags"], list):
-            if len(res["tags"]) > 2:
-                print(f"Warning: LLM returned {len(res['tags'])} tags, keeping only the first two.")
-            res["tags"] = [tag.strip() for tag in res["tags"] if isinstance(tag, str) and tag.strip()][:2] # Clean and limit
-        else:
-            res["tags"] = [] # If not a list, treat as empty
-
-    except (json.JSONDecodeError, OutputParserException) as e:
-        error_message = f"Failed to parse LLM response into valid JSON metadata. Response content:\n---\n{content}\n---\nError: {e}"
+        res = res.get("posts") if isinstance(res, dict) else None
+        if not isinstance(res, list) or len(res) != len(post_texts):
+            raise OutputParserException(f"Expected a \"posts\" array of {len(post_texts)} objects.")
+        if not all(isinstance(item, dict) and "tags" in item for item in res):
+            raise OutputParserException("Parsed JSON array contains items missing the required key 'tags'.")
+    except OutputParserException as e:
+        error_message = f"Failed to parse LLM response into valid JSON metadata batch. Response content:\n---\n{content}\n---\nError: {e}"
         raise OutputParserException(error_message)
-    return res
 
+    return [_build_metadata(post_text, item) for post_text, item in zip(post_texts, res)]
 
-def get_unified_tags(posts_with_metadata):
+
+def _build_metadata(post_text, item):
+    """Combines a parsed LLM item with the locally computed line count."""
+    tags = _clean_tags(item["tags"])
+    return {"line_count": count_lines(post_text), "tags": tags, "category": _resolve_category(item.get("category"), tags)}
+
+
+def _resolve_category(category, tags):
+    """
+    Validates the LLM's category, falling back to the category of the first tag
+    that matches a known topic. Returns None if neither yields an allowed category.
     """
-    Collects unique tags from posts and uses an LLM to create a unified mapping.
+    if category in ALLOWED_CATEGORIES:
+        return category
+    for tag in tags:
+        fallback = _TAG_TO_CATEGORY.get(normalize_tag(tag))
+        if fallback:
+            return fallback
+    print(f"Warning: LLM returned unknown category '{category}' and no tag matched a known topic.")
+    return None
+
+
+def _clean_tags(tags):
+    """Strips tag strings and limits them to the first two; non-lists become empty."""
+    if not isinstance(tags, list):
+        return []
+    if len(tags) > 2:
+        print(f"Warning: LLM returned {len(tags)} tags, keeping only the first two.")
+    return [tag.strip() for tag in tags if isinstance(tag, str) and tag.strip()][:2]
+
+
+def extract_metadata(post_text):
+    """
+    Synchronous wrapper around aextract_metadata for one-off calls, using an async
+    client opened for this call's event loop.
 
     Args:
-        posts_with_metadata (list): List of post dictionaries, each with a 'tags' key.
+        post_text (str): The text content of the LinkedIn post.
 
     Returns:
-        dict: A dictionary mapping original tags to unified tags.
+        dict: A dictionary containing 'line_count', 'tags' and 'category'.
 
     Raises:
         OutputParserException: If the LLM response cannot be parsed as JSON.
     """
-    unique_tags = set()
-    # Loop through each post and extract the tags safely
-    for post in posts_with_metadata:
-        if 'tags' in post and isinstance(post['tags'], list):
-            unique_tags.update(tag for tag in post['tags'] if isinstance(tag, str)) # Ensure tags are strings
-
-    if not unique_tags:
-        print("No unique tags found to unify.")
-        return {} # Return empty map if no tags
+    return asyncio.run(_extract_metadata_once(post_text))
 
-    unique_tags_list = sorted(list(unique_tags))
-    tags_string = ','.join(unique_tags_list)
 
-    template = '''I will give you a list of tags, separated by commas. Your goal is to act as a strict tag unification and generalization engine. Analyze the list and create a mapping where each original tag maps to a single, unified, and more general category tag. Aim to reduce the total number of unique tags to around 100, focusing on broader themes. Follow the rules and examples below carefully.
+async def _extract_metadata_once(post_text):
+    async with async_llm(SMALL_MODEL) as llm:
+        return await aextract_metadata(post_text, llm=llm.bind(response_format=_JSON_MODE))
 
-**Rules:**
-1.  **Unify and Merge Aggressively:** Combine similar or related tags into significantly broader, consistent category tags. Prioritize higher-level concepts. Use Title Case for all final unified category tags (e.g., "AI Applications").
-    * Example 1: "Jobseekers", "Job Hunting", "Placement Tips", "Resume Building", "Interview Prep", "Interview Tips" should merge to "Career Advice".
-    * Example 2: "Motivation", "Inspiration", "Drive", "Mindfulness", "Wellness", "Mental Health", "Self Improvement", "Personal Growth", "Personal Development", "Morning Routine", "Productivity Hacks", "Time Management" should merge to "Personal & Professional Growth".
-    * Example 3: Various specific AI/ML techniques and concepts like "Convolutional Neural Networks", "Recurrent Neural Networks", "Transformer Architecture", "Attention Mechanism", "Embeddings", "Backpropagation", "Gradient Descent", "Hyperparameter Tuning", "Regularization", "Optimization", "Activation Functions" should merge to broader categories like "Deep Learning Techniques", "Neural Network Fundamentals", or "Model Training & Optimization".
-    * Example 4: Specific AI applications like "Computer Vision", "NLP", "Natural Language Processing", "Object Detection", "Image Processing", "Semantic Segmentation", "Speech Recognition" should merge to "AI Applications".
-    * Example 5: Specific AI/ML tools and libraries like "Sklearn", "PyTorch", "TensorFlow", "OpenCV", "Transformers", "FastAPI", "MLflow" should merge to "AI/ML Tools & Frameworks".
-    * Example 6: Different aspects of AI development and deployment like "AI Debugging", "AI Deployment", "AI Engineering", "AI Infrastructure", "AI Model Deployment", "AI Model Development", "AI Pipelines", "CI/CD", "Docker" should merge to "AI/ML Development & Deployment".
-    * Example 7: Ethical and governance aspects like "AI Ethics", "AI Governance", "AI Regulation", "Responsible AI", "Bias Reduction", "Data Bias", "Model Bias", "Explainable AI" should merge to "AI Ethics & Governance".
-    * **Crucial Example 8 (AI Humor):** Tags like "AI Humor", "Tech Lightheartedness", "Developer Jokes", "Coding Humor", "Career Humor", "Humor", "Developer Jokes", "Coding Frustration" should merge specifically to "AI/Tech Humor".
 
-2.  **Aim for Around 100 Unified Tags:** Be aggressive in merging to achieve a significantly reduced set of broader categories. If very specific tags don't clearly fit into an existing broader category, consider creating a new, moderately general category. Ensure EVERY original tag provided in the list below is present as a key in your output JSON map.
+async def aextract_metadata(post_text, llm=_json_llm):
+    """
+    Uses an LLM to classify a post into one of ALLOWED_CATEGORIES and extract
+    up to two relevant tags from its text.
+    The line count is computed locally rather than by the LLM.
 
-3.  **Output Format:** Respond ONLY with a single, valid JSON object. Do not include any text before or after the JSON object. Start the response directly with `{`.
+    Args:
+        post_text (str): The text content of the LinkedIn post.
+        llm (Runnable): The JSON-mode model to call. Defaults to the shared small model.
 
-4.  **JSON Structure:** The JSON object MUST be a flat dictionary where each original tag is a key, and the value is the single unified category tag it maps to. Example: {"Original Tag 1": "Unified Category A", "Original Tag 2": "Unified Category B", ...}
+    Returns:
+        dict: A dictionary containing 'line_count', 'tags' and 'category'.
 
-List of Original Tags:
-{tags}
-'''
-    pt = PromptTemplate.from_template(template)
-    chain = pt | llm
+    Raises:
+        OutputParserException: If the LLM response cannot be parsed as JSON.
+    """
     try:
-        response = chain.invoke(input={"tags": tags_string})
+        response = await (_EXTRACT_PROMPT | llm).ainvoke(input={"post": post_text})
         content = response.content 
     except Exception as e:
-         raise OutputParserException(f"LLM invocation failed for tag unification: {e}")
+        raise OutputParserException(f"LLM invocation failed: {e}")
 
     try:
         json_parser = JsonOutputParser()
         res = json_parser.parse(content)
-        # Validation: Ensuring it's a dict and values are strings
-        if not isinstance(res, dict):
-            raise OutputParserException("Unified tag map is not a dictionary.")
-        # Check if all original tags are keys in the response map
-        missing_keys = unique_tags - set(res.keys())
-        if missing_keys:
-             print(f"Warning: LLM response for unified tags is missing keys for: {missing_keys}")
-             # Add missing keys mapping to themselves to avoid errors later
-             for key in missing_keys:
-                 res[key] = key # Map missing tags to themselves
-
-        for key, value in res.items():
-            if not isinstance(value, str):
-                print(f"Warning: Unified tag for '{key}' is not a string ('{value}'). Converting to string.")
-                res[key] = str(value)
-
-    except (json.JSONDecodeError, OutputParserException) as e:
-        error_message = f"Failed to parse LLM response into valid JSON tag map. Response content:\n---\n{content}\n---\nError: {e}"
+        # Basic validation
+        if not isinstance(res, dict) or "tags" not in res:
+            raise OutputParserException("Parsed JSON missing required key 'tags'.")
+        # Validate tags and category
+        res = _build_metadata(post_text, res)
+
+    except OutputParserException as e:
+        error_message = f"Failed to parse LLM response into valid JSON metadata. Response content:\n---\n{content}\n---\nError: {e}"
         raise OutputParserException(error_message)
     return res
 
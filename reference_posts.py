@@ -1,111 +1,307 @@
+import numpy as np
 import pandas as pd
-import json
+import orjson
 import os
+import pickle
+import threading
+from category_topics import normalize_tag
 
 os.makedirs("data", exist_ok=True)
 
+# Length categories in code order; see categorize_length for the line-count boundaries
+LENGTH_CATEGORIES = ["Short", "Medium", "Long", "Unknown"]
+
+_EMPTY_INDEX = np.empty(0, dtype=np.int32)
+
+# Fields read from each processed post
+POST_COLUMNS = ['text', 'line_count', 'tags', 'language', 'engagement']
+# Fields of each post returned by get_filtered_posts and get_top_engaging_posts
+RESULT_COLUMNS = ['text', 'tags', 'length', 'engagement']
+# Columns of the empty DataFrame left when no posts could be loaded
+EMPTY_COLUMNS = ['text', 'line_count', 'tags', 'language', 'length', 'engagement']
+# Cleaned-DataFrame cache written by load_posts. It is a pickle and thus executes code when
+# loaded: it lives at this fixed app-owned path (never one derived from caller input), is
+# only written by this module, and must not be replaced by untrusted files.
+POSTS_CACHE_PATH = "data/pro_posts.pkl"
+# Bumped whenever the cleaning or the cache layout changes, so older caches are rebuilt
+POSTS_CACHE_VERSION = 2
+# Columns every loaded frame has; checked once in _build_indexes rather than on every query
+REQUIRED_COLUMNS = ['tags', 'language', 'length', 'text', 'engagement']
+
 class ReferencePosts:
     def __init__(self, file_path="data/pro_posts.json"):
         """
-        Initializes the ReferencePosts class by loading and processing posts.
+        Initializes the ReferencePosts class. Posts are loaded and processed lazily,
+        on the first call that needs them.
 
         Args:
             file_path (str): Path to the processed posts JSON file.
         """
+        self.file_path = file_path
+        # Set only once a load has fully succeeded; loads are serialized by _load_lock so
+        # concurrent sessions sharing the instance never query a half-built one
+        self._loaded = False
+        self._load_lock = threading.RLock()
+        # (exception or None if no posts were found, source mtime or None if missing) of the
+        # last failed load, so the same failure is not retried and reported again on every query
+        self._load_failure = None
         self.df = None
         self.unique_tags = []
+        # Lookup structures built once by load_posts so filtering needs no per-row Python calls
+        # Tag membership in compressed sparse column layout: the rows carrying the tag in
+        # column c are _tag_rows[_tag_indptr[c]:_tag_indptr[c + 1]], in ascending order
+        self._tag_to_col = {}
+        self._tag_indptr = np.zeros(1, dtype=np.int64)
+        self._tag_rows = _EMPTY_INDEX
+        self._english_by_length = np.empty((len(LENGTH_CATEGORIES), 0), dtype=bool)
+        # Engagement of every row as int64, so ranking never converts the column per query
+        self._engagement = np.empty(0, dtype=np.int64)
+        # Post texts are stored apart from the other columns and only gathered for returned rows
+        self._texts = np.empty(0, dtype=object)
+        self._meta_df = pd.DataFrame(columns=[col for col in EMPTY_COLUMNS if col != 'text'])
+        # Matching row positions keyed on (length code, tag column) as resolved by _query_key,
+        # so the memo is bounded by the known lengths and tags; the DataFrame is read-only
+        # after load_posts
+        self._filter_cache = {}
+
+
+    def _ensure_loaded(self):
+        """
+        Loads the posts from self.file_path on first use. A failed load is reported once and
+        leaves an empty DataFrame and tag list; it is retried only after the file changes
+        (its modification time differs, or it appears or disappears).
+
+        Returns:
+            bool: True if the posts are loaded.
+        """
+        if self._loaded:
+            return True
+        with self._load_lock:
+            if self._loaded: # Loaded by another thread while waiting for the lock
+                return True
+            file_path = self.file_path
+            source_mtime = self._source_mtime(file_path)
+            if self._load_failure is not None and self._load_failure[1] == source_mtime:
+                return False # Unchanged since the last failed load
+            try:
+                self.load_posts(file_path)
+                if self.df.empty: # Empty or invalid file; picked up once it is rewritten
+                    self._loaded = False
+                    self._load_failure = (None, source_mtime)
+                else:
+                    self._load_failure = None
+                if self.unique_tags:
+                    print(f"Loaded {len(self.unique_tags)} unique tags. Sample: {self.unique_tags[:10]}")
+                else:
+                    print("No unique tags found in the processed data.")
+            except FileNotFoundError as e:
+                print(f"Warning: Processed posts file not found at {file_path}. Few-shot examples and tag list will be unavailable.")
+                # Initializing empty dataframe and tags list to avoid errors later
+                self.df = pd.DataFrame(columns=EMPTY_COLUMNS)
+                self.unique_tags = []
+                self._load_failure = (e, source_mtime)
+            except Exception as e:
+                print(f"Error loading or processing posts from {file_path}: {e}")
+                self.df = pd.DataFrame(columns=EMPTY_COLUMNS)
+                self.unique_tags = []
+                self._load_failure = (e, source_mtime)
+        return self._loaded
+
+
+    def _source_mtime(self, file_path):
+        """Returns the modification time of file_path, or None if it cannot be read."""
         try:
-            self.load_posts(file_path)
-            if self.unique_tags:
-                print(f"Loaded {len(self.unique_tags)} unique tags. Sample: {self.unique_tags[:10]}")
-            else:
-                print("No unique tags found in the processed data.")
-        except FileNotFoundError:
-            print(f"Warning: Processed posts file not found at {file_path}. Few-shot examples and tag list will be unavailable.")
-            # Initializing empty dataframe and tags list to avoid errors later
-            self.df = pd.DataFrame(columns=['text', 'line_count', 'tags', 'language', 'length', 'engagement'])
-            self.unique_tags = []
-        except Exception as e:
-            print(f"Error loading or processing posts from {file_path}: {e}")
-            self.df = pd.DataFrame(columns=['text', 'line_count', 'tags', 'language', 'length', 'engagement'])
-            self.unique_tags = []
+            return os.path.getmtime(file_path)
+        except OSError:
+            return None
 
 
     def load_posts(self, file_path):
         """
         Loads posts from a JSON file, normalizes them into a DataFrame,
         categorizes their length, and extracts unique tags. Assumes posts are English.
+        The cleaned DataFrame is cached at POSTS_CACHE_PATH; while the cache was built from
+        this file and is newer than it, it is loaded instead and parsing and cleaning are skipped.
 
         Args:
             file_path (str): Path to the processed posts JSON file.
         """
-        with open(file_path, encoding="utf-8") as f:
+        with self._load_lock:
+            self._loaded = False
+            # Results from previously loaded posts are stale; in-flight queries keep the old dict
+            self._filter_cache = {}
+            self._read_posts(file_path)
+            self._loaded = True # Replaces the lazy load
+
+
+    def _read_posts(self, file_path):
+        """Loads file_path (or its cache) into self.df and builds the indexes; see load_posts."""
+        cache_path = POSTS_CACHE_PATH
+        if self._load_cached_frame(file_path, cache_path):
+            print(f"Loaded {len(self.df)} posts from cache {cache_path}.")
+            self._build_indexes()
+            return
+
+        with open(file_path, mode="rb") as f:
             try:
-                posts = json.load(f)
-            except json.JSONDecodeError:
+                posts = orjson.loads(f.read())
+            except orjson.JSONDecodeError:
                 print(f"Error: Could not decode JSON from {file_path}")
                 posts = [] # Treat as empty if invalid JSON
 
             if not posts: # Handle empty file or decode error
                 print(f"Warning: File {file_path} is empty or invalid. No posts loaded.")
-                self.df = pd.DataFrame(columns=['text', 'line_count', 'tags', 'language', 'length', 'engagement'])
+                self.df = pd.DataFrame(columns=EMPTY_COLUMNS)
                 self.unique_tags = []
                 return
 
-            self.df = pd.json_normalize(posts)
+            # Posts are flat records, so from_records with explicit columns avoids json_normalize's
+            # recursive key walk; keys missing from a post become NaN
+            self.df = pd.DataFrame.from_records(posts, columns=POST_COLUMNS)
             print(f"Loaded {len(self.df)} posts into DataFrame.")
 
             # --- Data Cleaning and Column Handling ---
+            missing_cols = [col for col in POST_COLUMNS if self.df[col].isna().all()]
+            if missing_cols:
+                print(f"Warning: {missing_cols} missing from all posts. Using defaults for these columns.")
+
             # Line Count and Length Category
-            if 'line_count' not in self.df.columns:
-                print("Warning: 'line_count' column missing. Setting length to 'Unknown'.")
-                self.df['line_count'] = pd.NA # Using pandas NA for missing integers
-                self.df['length'] = "Unknown"
-            else:
-                # Ensure line_count is numeric, coercing errors to NA
-                self.df['line_count'] = pd.to_numeric(self.df['line_count'], errors='coerce')
-                # Categorizing length, handling NA values
-                self.df['length'] = self.df['line_count'].apply(self.categorize_length)
+            # Ensure line_count is numeric, coercing errors to NA; downcast to the smallest
+            # integer type when no values are missing
+            self.df['line_count'] = pd.to_numeric(self.df['line_count'], errors='coerce', downcast='integer')
+            # Categorizing length in one vectorized pass (same boundaries as categorize_length)
+            self.df['length'] = self.categorize_lengths(self.df['line_count'])
 
             # Tags
-            if 'tags' not in self.df.columns:
-                print("Warning: 'tags' column missing. Tags will be empty.")
-                self.df['tags'] = [[] for _ in range(len(self.df))] # Add empty list for tags
-                self.unique_tags = []
-            else:
-                # Ensuring tags are lists, for handling potential NaNs or non-list entries gracefully
-                self.df['tags'] = self.df['tags'].apply(lambda x: x if isinstance(x, list) else [])
-                # Flatten the list of tags and to get unique ones
-                try:
-                    all_tags = [tag for sublist in self.df['tags'] for tag in sublist if isinstance(tag, str)]
-                    self.unique_tags = sorted(list(set(all_tags))) # Sort for consistency
-                except Exception as e:
-                    print(f"Error processing tags column: {e}")
-                    self.unique_tags = []
-
-            # Language
-            if 'language' not in self.df.columns:
-                print("Warning: 'language' column missing. Assuming 'English'.")
-                self.df['language'] = "English"
-            else:
-                self.df['language'] = self.df['language'].fillna("English")
+            # Ensuring tags are lists, for handling potential NaNs or non-list entries gracefully.
+            # Only the (rare) non-list rows are visited in Python.
+            tags = self.df['tags'].to_numpy(dtype=object, copy=True)
+            is_list = self.df['tags'].map(type).to_numpy() == list
+            for i in np.flatnonzero(~is_list):
+                tags[i] = []
+            self.df['tags'] = tags # Unique tags are collected while interning them in _build_indexes
+
+            # Language, lowercased once (categorical: a few distinct values repeated on every row)
+            self.df['language'] = self.df['language'].fillna("English").astype(str).str.lower().astype('category')
 
             # Text
-            if 'text' not in self.df.columns:
-                print("Warning: 'text' column missing. Setting to empty string.")
-                self.df['text'] = ""
-
-            # Engagement
-            if 'engagement' not in self.df.columns:
-                print("Warning: 'engagement' column missing. Setting to 0.")
-                self.df['engagement'] = 0
-            else:
-                self.df['engagement'] = pd.to_numeric(self.df['engagement'], errors='coerce').fillna(0).astype(int)
+            self.df['text'] = self.df['text'].fillna("")
+
+            # Engagement, downcast to the smallest unsigned type when all counts are non-negative
+            engagement = pd.to_numeric(self.df['engagement'], errors='coerce').fillna(0).astype(int)
+            self.df['engagement'] = pd.to_numeric(engagement, downcast='unsigned')
+
+            self._build_indexes()
+            self._save_cached_frame(file_path, cache_path)
+
+
+    def _load_cached_frame(self, file_path, cache_path):
+        """
+        Restores the cleaned DataFrame from cache_path if it was built from file_path, is at
+        least as new as it and was written with the current POSTS_CACHE_VERSION. The cache
+        is unpickled, so cache_path must be trusted (see POSTS_CACHE_PATH).
+
+        Returns:
+            bool: True if the cache was loaded, False if it is missing, stale, from another
+                  version or source file, or unreadable.
+
+        Raises:
+            FileNotFoundError: If file_path does not exist.
+        """
+        source_mtime = os.path.getmtime(file_path)
+        try:
+            if os.path.getmtime(cache_path) < source_mtime:
+                return False
+            with open(cache_path, mode="rb") as f:
+                payload = pickle.load(f)
+            # Caches from other versions may hold a bare DataFrame or differently shaped tuples
+            if not (isinstance(payload, tuple) and len(payload) == 3):
+                return False
+            version, source_path, df = payload
+            if not (isinstance(version, int) and version == POSTS_CACHE_VERSION and isinstance(df, pd.DataFrame)):
+                return False
+            if source_path != os.path.abspath(file_path):
+                return False
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Warning: Could not read posts cache at {cache_path}: {e}. Reloading from JSON.")
+            return False
+        self.df = df
+        return True
+
+
+    def _save_cached_frame(self, file_path, cache_path):
+        """Writes the cleaned DataFrame built from file_path to cache_path, reporting (but not raising) write errors."""
+        try:
+            with open(cache_path, mode="wb") as f:
+                pickle.dump((POSTS_CACHE_VERSION, os.path.abspath(file_path), self.df), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except (IOError, pickle.PicklingError) as e:
+            print(f"Error writing posts cache to {cache_path}: {e}")
+
+
+    def _build_indexes(self):
+        """
+        Splits the post texts from the other columns, collects the sorted unique tags and
+        precomputes the filtering structures: a normalized tag -> rows sparse index and an
+        English mask per length category.
+
+        Raises:
+            ValueError: If the loaded DataFrame lacks any of REQUIRED_COLUMNS.
+        """
+        missing_cols = [col for col in REQUIRED_COLUMNS if col not in self.df.columns]
+        if missing_cols:
+            raise ValueError(f"Loaded posts are missing required columns: {missing_cols}")
+
+        # Long text strings would only be dragged through every query; they are looked up
+        # by row position once the matching rows are known
+        self._texts = self.df['text'].to_numpy(dtype=object)
+        self._meta_df = self.df.drop(columns=['text'])
+
+        # Intern each distinct tag string to an int id in a single pass over the tag lists;
+        # everything after that (normalization, dedupe, grouping) works on the ids
+        tag_ids = {}
+        flat_ids = []
+        counts = []
+        for tags in self._meta_df['tags'].to_numpy():
+            before = len(flat_ids)
+            flat_ids.extend(tag_ids.setdefault(tag, len(tag_ids)) for tag in tags if isinstance(tag, str))
+            counts.append(len(flat_ids) - before)
+        self.unique_tags = sorted(tag_ids) # Sort for consistency
+
+        # Normalization runs once per distinct tag rather than once per occurrence
+        tag_to_col = {}
+        id_to_col = np.fromiter(
+            (tag_to_col.setdefault(normalize_tag(tag), len(tag_to_col)) for tag in tag_ids),
+            dtype=np.int64, count=len(tag_ids),
+        )
+        n_rows = len(self._meta_df)
+        rows = np.repeat(np.arange(n_rows, dtype=np.int64), counts)
+        cols = id_to_col[np.asarray(flat_ids, dtype=np.int64)]
+        # One sorted, deduplicated key per (column, row) pair: grouped by column, rows ascending
+        keys = np.unique(cols * n_rows + rows)
+        cols = keys // max(n_rows, 1)
+        self._tag_rows = (keys % max(n_rows, 1)).astype(np.int32)
+        self._tag_indptr = np.zeros(len(tag_to_col) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=len(tag_to_col)), out=self._tag_indptr[1:])
+        self._tag_to_col = tag_to_col
+
+        # Languages are lowercased at load, so English is a single category code
+        languages = self._meta_df['language'].cat
+        if 'english' in languages.categories:
+            is_english = languages.codes.to_numpy() == languages.categories.get_loc('english')
+        else:
+            is_english = np.zeros(n_rows, dtype=bool)
+        length_codes = self._meta_df['length'].cat.codes.to_numpy()
+        self._english_by_length = is_english & (length_codes == np.arange(len(LENGTH_CATEGORIES))[:, None])
+
+        self._engagement = self._meta_df['engagement'].to_numpy().astype(np.int64)
 
 
     def get_filtered_posts(self, length, tag):
         """
         Filters posts based on length category and tag, assuming English language.
+        Tags are compared after normalization, so any typographic variant of a tag matches.
 
         Args:
             length (str): The desired length category ("Short", "Medium", "Long").
@@ -113,27 +309,84 @@ class ReferencePosts:
 
         Returns:
             list: A list of dictionaries representing the filtered posts.
-                 Returns empty list if df is None, empty, or filtering fails.
+                 Returns empty list if df is None, empty, tag is not a string,
+                 or no posts match.
         """
-        if self.df is None or self.df.empty:
+        if not self._ensure_loaded() or not isinstance(tag, str):
             return []
-
-        # Ensuring required columns exist before filtering
-        required_cols = ['tags', 'language', 'length', 'text', 'engagement']
-        if not all(col in self.df.columns for col in required_cols):
-            print("Warning: DataFrame is missing required columns for filtering.")
+        key = self._query_key(length, tag)
+        if key is None:
             return []
+        return self._records(self._matching_rows(key))
 
-        try:
-            df_filtered = self.df[
-                (self.df['tags'].apply(lambda tags: isinstance(tags, list) and tag in tags)) &
-                (self.df['language'].astype(str).str.lower() == 'english') &
-                (self.df['length'] == length)
-            ]
-            return df_filtered[['text', 'tags', 'length', 'engagement']].to_dict(orient='records')
-        except Exception as e:
-            print(f"Error during filtering: {e}")
-            return []
+
+    def _query_key(self, length, tag):
+        """
+        Resolves a query to (length code, tag column) in terms of the loaded indexes.
+        Returns None if no posts can match.
+        """
+        if self.df is None or self.df.empty:
+            return None
+        if length not in LENGTH_CATEGORIES:
+            return None
+        length_code = LENGTH_CATEGORIES.index(length)
+        col = self._tag_to_col.get(normalize_tag(tag))
+        if col is None:
+            return None
+        return (length_code, col)
+
+
+    def _matching_rows(self, key):
+        """
+        Returns the row positions of English posts with the key's length category and tag,
+        using the indexes precomputed by load_posts. Memoized per key once the posts are loaded.
+        """
+        cache = self._filter_cache
+        if key not in cache:
+            length_code, col = key
+            # Candidate rows carrying the tag, narrowed by a single gather from the precomputed mask
+            idx = self._tag_column_rows(col)
+            idx = idx[self._english_by_length[length_code][idx]]
+            if not self._loaded: # Never memoize results computed while (re)loading
+                return idx
+            cache[key] = idx
+        return cache[key]
+
+
+    def _top_rows(self, key, n):
+        """
+        Returns the row positions of the n most engaging posts in _matching_rows(key), highest
+        first (ties keep file order). The n largest are selected in O(M) and only they are sorted.
+        """
+        idx = self._matching_rows(key)
+        engagement = self._engagement[idx]
+        if n < len(idx):
+            # The n-th largest engagement; rows above it all qualify, and rows equal to it fill
+            # the remaining places in file order (idx is ascending)
+            threshold = np.partition(engagement, len(idx) - n)[len(idx) - n]
+            above = engagement > threshold
+            ties = np.flatnonzero(engagement == threshold)[:n - np.count_nonzero(above)]
+            selected = np.sort(np.concatenate((np.flatnonzero(above), ties)))
+            idx, engagement = idx[selected], engagement[selected]
+        return idx[np.argsort(-engagement, kind='stable')]
+
+
+    def _records(self, idx):
+        """
+        Builds one new dict of RESULT_COLUMNS per row position in idx, in order. Columns are
+        gathered once and zipped, avoiding DataFrame.to_dict's per-row conversion overhead.
+        Tag lists are copied, so callers can modify the results without touching the DataFrame.
+        """
+        columns = [
+            self._texts[idx].tolist() if col == 'text' else self._meta_df[col].iloc[idx].tolist()
+            for col in RESULT_COLUMNS
+        ]
+        columns[RESULT_COLUMNS.index('tags')] = [list(tags) for tags in columns[RESULT_COLUMNS.index('tags')]]
+        return [dict(zip(RESULT_COLUMNS, values)) for values in zip(*columns)]
+
+    def _tag_column_rows(self, col):
+        """Returns the row positions of posts carrying the tag in column col of the tag index, in file order."""
+        return self._tag_rows[self._tag_indptr[col]:self._tag_indptr[col + 1]]
 
     def get_top_engaging_posts(self, length, tag, n=2):
         """
@@ -147,19 +400,16 @@ class ReferencePosts:
         Returns:
             list: A list of dictionaries representing the top N engaging posts,
                   sorted by engagement in descending order. Returns an empty list
-                  if no matching posts are found or if 'engagement' column is missing.
+                  if tag is not a string or no matching posts are found.
         """
-        if self.df is None or self.df.empty or 'engagement' not in self.df.columns:
+        if not self._ensure_loaded() or self.df.empty or n <= 0 or not isinstance(tag, str):
             return []
 
-        filtered_posts = self.get_filtered_posts(length, tag)
-        if not filtered_posts:
+        key = self._query_key(length, tag)
+        if key is None:
             return []
-
-        # Sort by engagement in descending order
-        sorted_posts = sorted(filtered_posts, key=lambda x: x.get('engagement', 0), reverse=True)
-
-        return sorted_posts[:n]
+        # Records are built only for the top N rows
+        return self._records(self._top_rows(key, n))
 
 
     def categorize_length(self, line_count):
@@ -186,6 +436,25 @@ class ReferencePosts:
             return "Unknown" # Handle cases where conversion fails
 
 
+    def categorize_lengths(self, line_counts):
+        """
+        Vectorized equivalent of categorize_length for a whole column.
+
+        Args:
+            line_counts (pd.Series): Numeric line counts, possibly containing NA.
+
+        Returns:
+            pd.Categorical: The length category of each post, with categories LENGTH_CATEGORIES.
+        """
+        counts = np.trunc(line_counts.to_numpy(dtype=float, na_value=np.nan)) # Truncate like int()
+        codes = np.select(
+            [np.isnan(counts), counts < 5, counts <= 10],
+            [LENGTH_CATEGORIES.index("Unknown"), LENGTH_CATEGORIES.index("Short"), LENGTH_CATEGORIES.index("Medium")],
+            default=LENGTH_CATEGORIES.index("Long"),
+        )
+        return pd.Categorical.from_codes(codes, categories=LENGTH_CATEGORIES)
+
+
     def get_tags(self):
         """
         Returns the list of unique tags found in the loaded posts.
@@ -195,6 +464,7 @@ class ReferencePosts:
         Returns:
             list: A list of unique tags.
         """
+        self._ensure_loaded()
         return self.unique_tags
 
 